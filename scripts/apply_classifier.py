@@ -8,6 +8,9 @@ from distutils import dir_util  # handle dirs
 import numpy as np
 
 from sklearn.externals import joblib
+from sklearn import set_config
+
+set_config(assume_finite=True)  # <-- role matrices are counts, so skip the NaN/inf scans
 
 stime = time.time()
 
@@ -23,10 +26,16 @@ if not os.path.isdir(trainDir):
     sys.stderr.write("not a valid trainDir: %s\n" % (trainDir))
     sys.exit(-1)
 
-X = np.genfromtxt(testDir + '/X', delimiter='\t')
-y = np.genfromtxt(testDir + '/y', delimiter='\t')
+#...load X in the same dtype train_classifier used for this classifier type.
+if clfType in ("DecisionTreeClassifier", "RandomForestClassifier", "ExtraTreesClassifier"):
+    X_dtype = np.float32
+else:
+    X_dtype = np.float64
+
+X = np.loadtxt(testDir + '/X', delimiter='\t', dtype=X_dtype)
+y = np.loadtxt(testDir + '/y', delimiter='\t')
 
-#...genfromtxt "helpfully" reformats a 1-row dataset as a vector, not an array,
+#...loadtxt "helpfully" reformats a 1-row dataset as a vector, not an array,
 #   so the number of dimensions must be tested, and reformatted if not 2D array.
 if len(X.shape) != 2:
     X = X.reshape(1,-1)
@@ -46,19 +55,12 @@ if not os.path.isdir(outDir):
 outFilename = outDir + '/y.out'
 outFile = open(outFilename,'w')
 
-ncorrect = 0
-nchecked = 0
-for idx in range(X.shape[0]):
-    nchecked += 1
-    instance  = X[idx]
-    instances = [instance]
-    predictions = clf.predict(instances)
-    prediction  = predictions[0]
-    if prediction == y[idx]:
-        ncorrect  += 1
-
-    print(idx, y[idx], prediction, sep='\t')
-    print(prediction, file=outFile)
+predictions = clf.predict(X)
+ncorrect = int(np.sum(predictions == y))
+nchecked = X.shape[0]
+
+np.savetxt(sys.stdout, np.column_stack([np.arange(len(y)), y, predictions]), fmt=['%d', '%s', '%s'], delimiter='\t')
+np.savetxt(outFile, predictions, fmt='%s')
 
 outFile.close()
 
@@ -4,12 +4,14 @@ import numpy as np
 import sys, os, time
 import shutil
 import argparse
-from sklearn.model_selection import KFold
+from sklearn.model_selection import KFold, cross_val_predict
 from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.externals import joblib
+from sklearn.base import clone
+from sklearn import config_context
 
-def make_predictor(n_col):
+def make_predictor(n_col, X_all):
         role_ID = col_names[n_col][1]
 
         pred_dir = args.probDir + "/Predictors/" + role_ID
@@ -23,31 +25,23 @@ def make_predictor(n_col):
                 os.mkdir(pkl_dir)
 
         y  = X_all[:, n_col]
-        X  = np.delete(X_all, n_col, axis=1)
-        kf = KFold(n_splits=n_fold, shuffle=True, random_state=30258509)
-        accuracies = np.zeros(n_fold)
-        n_cross = 0
-
-        for training, testing in kf.split(X):
-                clf.fit(X[training], y[training])
-                prediction = clf.predict(X[testing])
-                accuracies[n_cross] = np.mean(prediction == y[testing])*100.00
-                n_cross += 1
-
-        summary = [[args.classifier + 'Classifier']]
-        summary[0].append(np.round(np.mean(accuracies),2))
-        Q = np.percentile(accuracies, np.arange(0,125,25))
-        Q = np.round(Q, 2)
-        summary[0].extend(Q.tolist())
-        summary[0].append(np.round(0.25*Q[1] + 0.5*Q[2] + 0.25*Q[3],2))
-        summary[0].append(np.round(Q[3]-Q[1],2))
-        summary = np.array(summary)
-
-        clf.fit(X, y)
+        cols = np.concatenate((all_cols[:n_col], all_cols[n_col+1:]))
+        X  = X_all[:, cols]
+        est = clone(clf)  # <-- dask workers run several roles at once in threads
+        #...set here, not at the top: loky and dask workers never run the script's top level.
+        with config_context(assume_finite=True):
+                prediction = cross_val_predict(est, X, y, cv=splits, n_jobs=1)
+                est.fit(X, y)
+        accuracies = np.bincount(fold_of_row, weights=(prediction == y), minlength=n_fold) / fold_sizes*100.00
+
+        Q = np.round(np.percentile(accuracies, [0, 25, 50, 75, 100]), 2)
+        summary = (args.classifier + 'Classifier', np.round(np.mean(accuracies),2)) + tuple(Q.tolist()) + \
+                  (np.round(0.25*Q[1] + 0.5*Q[2] + 0.25*Q[3],2), np.round(Q[3]-Q[1],2))
+
         clfFilename = pkl_dir + '/' + args.classifier + 'Classifier'
-        joblib.dump(clf, clfFilename)
+        joblib.dump(est, clfFilename, compress=3)
         acc_file = pkl_dir + "/accuracy"
-        np.savetxt(acc_file, summary, fmt="%s", delimiter='\t')
+        np.savetxt(acc_file, [summary], fmt="%s", delimiter='\t')
         print("Completed %d: %s predictor." % (n_col, role_ID))
         sys.stdout.flush()
 
@@ -61,18 +55,27 @@ parser.add_argument("probDir", help="Directory which contains a role matrix",
 parser.add_argument("-f", "--fraction", dest="fraction", default=0.2, type=float, help="Fraction of data to use in testing")
 parser.add_argument("-c", "--classifier", dest="classifier", default="RandomForest", help="Type of sklearn classifier to use")
 parser.add_argument("-n", "--n_jobs", dest="n_jobs", default=8, help="Number of parallel jobs to run")
+parser.add_argument("--scheduler", dest="scheduler", default=None, help="Address of a dask.distributed scheduler to run the jobs on")
 parser.add_argument("--clear", action="store_true",
                   help="Clear input probDir Predictors directory")
 args = parser.parse_args()
 
+#...the tree classifiers split on float32 internally, so load X in that dtype for them;
+#   the other estimators would either upcast it again or fit in single precision.
+if args.classifier in ("DecisionTree", "RandomForest", "ExtraTrees"):
+        X_dtype = np.float32
+else:
+        X_dtype = np.float64
+
 try:
-        X_all = np.genfromtxt(args.probDir + '/X', delimiter='\t')
+        X_all = np.loadtxt(args.probDir + '/X', delimiter='\t', dtype=X_dtype)
 except:
         sys.stderr.write("Matrix X not found in %s!\n" % args.probDir)
         sys.exit(-1)
+all_cols = np.arange(X_all.shape[1])
 
 try:
-        col_names = np.genfromtxt(args.probDir + '/col.h', delimiter='\t', dtype=str)
+        col_names = np.loadtxt(args.probDir + '/col.h', delimiter='\t', dtype=str, ndmin=2)
 except:
         sys.stderr.write("Column names file col.h not found in %s!\n" % args.probDir)
         sys.exit(-1)
@@ -104,6 +107,12 @@ if __name__ == '__main__':
         print("%d out of %d functions already processed. %d queued." % (pred_completed, X_all.shape[1], len(pred_to_run)))
 
 n_fold = int(1./args.fraction)
+#...every role uses the same rows and seed, so the folds are identical; split once.
+splits = list(KFold(n_splits=n_fold, shuffle=True, random_state=30258509).split(np.arange(X_all.shape[0])))
+fold_of_row = np.empty(X_all.shape[0], dtype=np.intp)
+for n_cross, (training, testing) in enumerate(splits):
+        fold_of_row[testing] = n_cross
+fold_sizes = np.bincount(fold_of_row, minlength=n_fold)
 
 clfType = args.classifier
 if clfType == "SVC":
@@ -124,7 +133,8 @@ elif clfType == "AdaBoost":
 elif clfType == "LogisticRegression":
         from sklearn.linear_model import LogisticRegression
 #	clf = LogisticRegression(solver="saga", penalty="l1", C=0.1, multi_class="multinomial", max_iter=50)
-        clf = LogisticRegression(solver="newton-cg", penalty="l2", C=1.0, multi_class="ovr", max_iter=50)
+#	clf = LogisticRegression(solver="newton-cg", penalty="l2", C=1.0, multi_class="ovr", max_iter=50)
+        clf = LogisticRegression(solver="saga", penalty="l2", C=1.0, multi_class="ovr", max_iter=50, tol=1e-3)
 elif clfType == "MultinomialNB":
         from sklearn.naive_bayes import MultinomialNB
         clf = MultinomialNB()
@@ -141,13 +151,21 @@ else:
 if __name__ == '__main__':
         err_file = open(args.probDir + '/train.err', 'w')
         sys.stderr = err_file
-        if args.n_jobs == '1':
+        if args.scheduler:
+            import dask
+            from dask.distributed import Client
+            client = Client(args.scheduler)
+            print("Using dask scheduler at %s." % args.scheduler)
+            X_scattered = client.scatter(X_all, broadcast=True)
+            results = dask.compute(*[dask.delayed(make_predictor)(n_col, X_scattered) for n_col in pred_to_run])
+            client.close()
+        elif args.n_jobs == '1':
             print("Looping in-process.")
             for n_col in pred_to_run:
                 print("Processing column %d" % n_col)
-                make_predictor(n_col)
+                make_predictor(n_col, X_all)
         else:
             print("%d processes will be used." % args.n_jobs)
-            results = joblib.Parallel(n_jobs=args.n_jobs)(joblib.delayed(make_predictor)(n_col) for n_col in pred_to_run)
+            results = joblib.Parallel(n_jobs=args.n_jobs)(joblib.delayed(make_predictor)(n_col, X_all) for n_col in pred_to_run)
         err_file.close()
         print("Finished in %0.3f seconds." % (time.time() - stime))
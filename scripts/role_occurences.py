@@ -19,11 +19,9 @@ args = parser.parse_args()
 
 roles_file = args.r
 genomes_file = args.g
-roles_list = []
 
 with open(roles_file) as roles:
-    for line in roles:
-        roles_list.append(line.rstrip())
+    roles_set = frozenset(line.rstrip() for line in roles)
 
 
 # svc_all_features -i ~/Tmp/foo peg | svc_function_of > ~/Tmp/bar
@@ -32,12 +30,15 @@ p1 = subprocess.Popen(["svc_all_features", "-i", genomes_file, "peg"], stdout=su
 p2 = subprocess.Popen(["svc_function_of"], stdin=p1.stdout, stdout=subprocess.PIPE)
 p3 = subprocess.Popen(["svc_functions_to_roles"], stdin=p2.stdout, stdout=subprocess.PIPE)
 p1.stdout.close()  # Allow p1 to receive a SIGPIPE if p2 exits.
-output = p3.communicate()[0].splitlines()
+p2.stdout.close()  # Likewise for p2 if p3 exits.
 
-for x in output:
-    fields = x.split('\t')
+for x in p3.stdout:
+    fields = x.rstrip('\r\n').split('\t')
 
-    if fields[3] in roles_list:
-        print(fields[3], fields[0], fields[1], sep='\t')
+    if fields[3] in roles_set:
+        sys.stdout.write('\t'.join((fields[3], fields[0], fields[1])) + '\n')
+
+p3.stdout.close()
+p3.wait()
 
 
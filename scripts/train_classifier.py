@@ -63,13 +63,19 @@ if not os.path.isdir(clfDir):
     dir_util.mkpath(clfDir)
 
 
-X = np.genfromtxt(trainDir + '/X', delimiter='\t')
-y = np.genfromtxt(trainDir + '/y', delimiter='\t')
+#...the tree classifiers split on float32 internally; the others keep float64.
+if clfType in ("DecisionTreeClassifier", "RandomForestClassifier", "ExtraTreesClassifier"):
+    X_dtype = np.float32
+else:
+    X_dtype = np.float64
+
+X = np.loadtxt(trainDir + '/X', delimiter='\t', dtype=X_dtype)
+y = np.loadtxt(trainDir + '/y', delimiter='\t')
 
 clf.fit(X,y)
 
 sys.stderr.write("joblib.dump-ing clf\n")
 clfFilename = clfDir + '/%s' % (clfType) 
-joblib.dump(clf,clfFilename)
+joblib.dump(clf,clfFilename,compress=3)
 
 sys.stderr.write("total time: %0.2f\n" % (time.time()-stime) )